@@ -1,19 +1,12 @@
+import heapq
 from collections import Counter
-from math import log2
 from string import punctuation
 from typing import Tuple, Literal
 
+from entropy_core import code_length_and_redundancy, entropy, histograms, unigram_counter
 
-def calculate_entropy(counter: Counter) -> float:
-    """
-    Подсчитывает энтропию текста по формуле Шеннона.
-    :param counter: Счётчик символов из текста.
-    :return: Энтропия исходного текста по формуле Шеннона.
-    """
-    n = sum(counter.values())
-    if n == 0:  # единичный случай: все символы текста идентичны
-        return 0.0
-    return sum((c / n) * log2(1 / (c / n)) for c in counter.values())
+# таблица удаления для str.translate: пробел и все символы препинания
+_CLEAN_TABLE = str.maketrans('', '', punctuation + ' ')
 
 
 def clear_text(text: str) -> str:
@@ -22,48 +15,36 @@ def clear_text(text: str) -> str:
     :param text: Текст, который требуется очистить.
     :return: Очищенный текст.
     """
-    text = text.replace(' ', '')
-    for char in punctuation:
-        text = text.replace(char, '')
-    return text
-
-
-def calculate_code_length_and_redundancy(counter: Counter, entropy: float) -> Tuple[float, float]:
-    """
-    Подсчитывает минимальную длину и её избыточность кода для равномерного побуквенного кодирования текста.
-    :param counter: Счётчик символов исходного текста.
-    :param entropy: Энтропия исходного текста.
-    :return: Минимальная длина кодирования и её избыточность.
-    """
-    symbols_count = len(counter)
-    # единичный случай: все символы текста идентичны
-    if symbols_count <= 1:
-        return 0.0, 0.0
-    code_length = log2(symbols_count)
-    return code_length, 1 - entropy / code_length  # избыточность кода
+    return text.translate(_CLEAN_TABLE)
 
 
-def remove_by_frequency(text: str, mode: Literal['top', 'bottom'], frac: float) -> Tuple[str, set[str]]:
+def remove_by_frequency(
+        text: str, mode: Literal['top', 'bottom'], frac: float, frequencies: Counter | None = None
+) -> Tuple[str, set[str]]:
     """
     Удаляет символы из текста по их частоте.
     :param text: Исходный текст для удаления.
     :param mode: Режим удаления: top - наиболее встречаемые; bottom - наименее встречаемые.
     :param frac: Проценталь символов для удаления (например, 0.2).
+    :param frequencies: Счётчик символов текста (если уже посчитан), иначе строится по тексту.
     :return: Текст без удалённых символов и сами удалённые символы.
     """
-    counter = Counter(text)
-    if not counter:
+    frequencies = frequencies if frequencies is not None else unigram_counter(histograms(text, bigrams=False)[0])
+    if not frequencies:
         return text, set()
 
-    symbols_count = len(counter)  # мощность алфавита
+    symbols_count = len(frequencies)  # мощность алфавита
     remove_n = max(1, round(frac * symbols_count))  # берётся доля символов для удаления из текста
 
+    # выбираем k крайних по частоте символов кучей, без полной сортировки алфавита
     if mode == 'top':
-        to_remove = {char for char, _ in counter.most_common()[:remove_n]}  # удаляем самые частые
+        pairs = heapq.nlargest(remove_n, frequencies.items(), key=lambda x: x[1])  # удаляем самые частые
     else:
-        to_remove = {char for char, _ in counter.most_common()[-remove_n:]}  # удаляем самые редкие
+        pairs = heapq.nsmallest(remove_n, frequencies.items(), key=lambda x: x[1])  # удаляем самые редкие
+    to_remove = {char for char, _ in pairs}
 
-    filtered = ''.join(char for char in text if char not in to_remove)  # строим новую строку без удалённых символов
+    # строим новую строку без удалённых символов за один проход str.translate
+    filtered = text.translate({ord(char): None for char in to_remove})
     return filtered, to_remove
 
 
@@ -74,7 +55,7 @@ def print_removal_diff(text: str, symbols: set[str], base_entropy: float) -> Non
     :param symbols: Удалённые символы.
     :param base_entropy: Базовая энтропия исходного текста.
     """
-    new_entropy = calculate_entropy(Counter(text))
+    new_entropy = entropy(histograms(text, bigrams=False)[0], len(text))
     print(' * Новый текст:', text)
     print(' * Удалённые символы:', symbols)
     print(' * Энтропия после удаления:', new_entropy)
@@ -82,7 +63,8 @@ def print_removal_diff(text: str, symbols: set[str], base_entropy: float) -> Non
 
 
 def main() -> None:
-    with open('Workbook1.txt', 'r', encoding='UTF-8') as file:
+    # читаем файл целиком одним чтением через буфер 1 МиБ (текстовый режим сохраняет нормализацию переводов строк)
+    with open('Workbook1.txt', 'r', encoding='UTF-8', buffering=1 << 20) as file:
         text = file.read()
     print('1) Исходный текст файла:', text)
 
@@ -91,29 +73,31 @@ def main() -> None:
     with open('Workbook1_output_1.txt', 'w', encoding='UTF-8') as file:
         file.write(text)
 
-    unigrams = Counter(text)
-    bigrams = Counter(text[i:i + 2] for i in range(len(text) - 1))
+    unigrams, bigrams = histograms(text)
+    frequencies = unigram_counter(unigrams)  # частоты только встречающихся символов
+    n_unigrams, n_bigrams = len(text), max(len(text) - 1, 0)
 
     print('3) Частота однобуквенных сочетаний:')
-    for letter, count in unigrams.items():
+    for letter, count in frequencies.items():
         print(f' * {letter}: {count}')
 
-    entropy_unigrams = calculate_entropy(unigrams)
-    entropy_bigrams = calculate_entropy(bigrams)
+    # гистограммы уже построены, поэтому энтропии считаются по ним без повторного прохода по тексту
+    entropy_unigrams = entropy(unigrams, n_unigrams)
+    entropy_bigrams = entropy(bigrams, n_bigrams)
     print('4) Энтропии:')
     print(' * Энтропия для однобуквенных сочетаний:', entropy_unigrams)
     print(' * Энтропия для двухбуквенных сочетаний:', entropy_bigrams)
 
-    code_length, redundancy = calculate_code_length_and_redundancy(unigrams, entropy_unigrams)
+    code_length, redundancy = code_length_and_redundancy(len(frequencies), entropy_unigrams)
     print('5) Длина кода и избыточность:')
     print(' * Длина кода:', code_length)
     print(' * Избыточность:', redundancy)
 
-    text_top_removed, removed_symbols_top = remove_by_frequency(text, 'top', 0.2)
+    text_top_removed, removed_symbols_top = remove_by_frequency(text, 'top', 0.2, frequencies)
     print('6) После удаления 20% наиболее частых символов:')
     print_removal_diff(text_top_removed, removed_symbols_top, entropy_unigrams)
 
-    text_bottom_removed, removed_symbols_bottom = remove_by_frequency(text, 'bottom', 0.2)
+    text_bottom_removed, removed_symbols_bottom = remove_by_frequency(text, 'bottom', 0.2, frequencies)
     print('7) После удаления 20% наименее частых символов:')
     print_removal_diff(text_bottom_removed, removed_symbols_bottom, entropy_unigrams)
 
@@ -1,33 +1,9 @@
 from collections import Counter
-from math import log2
-from typing import Tuple
 
+import numpy as np
+from bitarray import bitarray, decodetree
 
-def calculate_entropy(counter: Counter) -> float:
-    """
-    Подсчитывает энтропию текста по формуле Шеннона.
-    :param counter: Счётчик символов из текста.
-    :return: Энтропия исходного текста по формуле Шеннона.
-    """
-    n = sum(counter.values())
-    if n == 0:  # единичный случай: все символы текста идентичны
-        return 0.0
-    return sum((c / n) * log2(1 / (c / n)) for c in counter.values())
-
-
-def calculate_code_length_and_redundancy(counter: Counter, entropy: float) -> Tuple[float, float]:
-    """
-    Подсчитывает минимальную длину и её избыточность кода для равномерного побуквенного кодирования текста.
-    :param counter: Счётчик символов исходного текста.
-    :param entropy: Энтропия исходного текста.
-    :return: Минимальная длина кодирования и её избыточность.
-    """
-    symbols_count = len(counter)
-    # единичный случай: все символы текста идентичны
-    if symbols_count <= 1:
-        return 0.0, 0.0
-    code_length = log2(symbols_count)
-    return code_length, 1 - entropy / code_length  # избыточность кода
+from entropy_core import bigram_counter, code_length_and_redundancy, entropy, histograms, unigram_counter
 
 
 def calculate_shannon_fano(counter: Counter) -> dict[str, str]:
@@ -36,93 +12,116 @@ def calculate_shannon_fano(counter: Counter) -> dict[str, str]:
     :param counter: Счётчик символов исходного текста.
     :return: Словарь, где ключ - символ, а значение - его код.
     """
-    # составляем словарь из символов текста и их кодов (в будущем)
-    codes = {char: '' for char in counter}
-
-    def split(group):
+    # составляем словарь из символов текста и их кодов (в будущем); коды накапливаются в bytearray
+    codes = {char: bytearray() for char in counter}
+
+    # сортируем частоту символов по убыванию и раскладываем в параллельные массивы:
+    # символы и накопленные частоты, чтобы группа задавалась диапазоном индексов [lo, hi)
+    items = sorted(counter.items(), key=lambda x: x[1], reverse=True)
+    chars = [char for char, _ in items]
+    cumfreq = np.cumsum(np.fromiter((frequency for _, frequency in items), dtype=np.int64, count=len(items)))
+
+    # обходим группы через явный стек диапазонов вместо рекурсии
+    stack = [(0, len(chars))]
+    while stack:
+        lo, hi = stack.pop()
         # если в группе 1 символ, делить нечего
-        if len(group) <= 1:
-            return
-
-        total = sum(frequency for _, frequency in group)  # подсчитываем общее количество символов в тексте
-        acc = 0  # "накопитель" частот слева направо
-        cut_idx = 0  # текущий индекс разреза
-        for i, (_, frequency) in enumerate(group):
-            acc += frequency
-            if acc >= total / 2:  # если больше половины, то режем после неё
-                cut_idx = i + 1
-                break
-
-        left, right = group[:cut_idx], group[cut_idx:]
+        if hi - lo <= 1:
+            continue
+
+        base = cumfreq[lo - 1] if lo else 0
+        total = cumfreq[hi - 1] - base  # подсчитываем общее количество символов в группе
+        # режем после первого символа, на котором накопленная частота достигает половины группы
+        cut_idx = int(np.searchsorted(cumfreq, base + total / 2)) + 1
+
         # по алгоритму Шеннона-Фано: добавляем 0 к кодам слева, а 1 - справа
-        for char, _ in left:
-            codes[char] += '0'
-        for char, _ in right:
-            codes[char] += '1'
+        for i in range(lo, cut_idx):
+            codes[chars[i]].append(ord('0'))
+        for i in range(cut_idx, hi):
+            codes[chars[i]].append(ord('1'))
 
-        split(right)
-        split(left)
+        stack.append((lo, cut_idx))
+        stack.append((cut_idx, hi))
 
-    # сортируем частоту символов по убыванию
-    split(sorted(counter.items(), key=lambda x: x[1], reverse=True))
-    return codes
+    # единичный случай: алфавит из одного символа делить нечего, поэтому даём ему однобитный код "0"
+    return {char: code.decode('ascii') or '0' for char, code in codes.items()}
 
 
-def encode(text: list[str], codec: dict[str, str]) -> str:
+def to_prefix_code(codec: dict[str, str]) -> dict[str, bitarray]:
+    """
+    Переводит кодек из строк '0'/'1' в словарь bitarray для кодирования/декодирования на уровне C.
+    Переводить кодек нужно один раз и передавать результат в encode/encode_bigrams и decodetree.
+    :param codec: Кодек - набор кодов для кодирования текста.
+    :return: Тот же кодек, где коды представлены упакованными bitarray.
+    """
+    return {char: bitarray(code) for char, code in codec.items()}
+
+
+def encode(text: str, prefix_code: dict[str, bitarray]) -> bitarray:
     """
     Кодирует приведённый текст при помощи ранее полученных кодов.
     :param text: Текст, который требуется закодировать.
-    :param codec: Кодек - набор кодов для кодирования текста.
-    :return: Закодированный текст, или же ошибка, если какие-то символы невозможно закодировать.
+    :param prefix_code: Кодек, переведённый в bitarray через to_prefix_code.
+    :return: Закодированный текст (упакованный набор битов), или же ошибка, если какие-то символы невозможно закодировать.
+    """
+    # отдельная проверка не нужна: bitarray.encode сам бросает ValueError на символе вне кодека
+    result = bitarray()
+    result.encode(prefix_code, text)
+    return result
+
+
+def encode_bigrams(text: str, prefix_code: dict[str, bitarray]) -> bitarray:
+    """
+    Кодирует текст по биграммам, не создавая промежуточный список биграмм.
+    :param text: Текст, который требуется закодировать.
+    :param prefix_code: Кодек для биграмм текста, переведённый в bitarray через to_prefix_code.
+    :return: Закодированный текст (упакованный набор битов).
     """
-    missing = {char for char in set(text) if char not in codec}
-    if missing:
-        raise ValueError(f'Missing characters: {missing}')
-    return ''.join(codec[char] for char in text)
+    result = bitarray()
+    result.encode(prefix_code, map(''.join, zip(text, text[1:])))
+    return result
 
 
-def decode(bitstring: str, codec: dict[str, str]) -> str:
+def decode(bits: bitarray, tree: decodetree) -> str:
     """
-    Декодирует строковый набор битов в текст при помощи кодека.
-    :param bitstring: Строковый набор битов для декодирования.
-    :param codec: Кодек, использовавшийся для кодирования текста.
+    Декодирует упакованный набор битов в текст при помощи дерева кодов.
+    :param bits: Упакованный набор битов для декодирования.
+    :param tree: Дерево декодирования, построенное один раз по кодеку (decodetree(to_prefix_code(codec))).
     :return: Декодированный текст.
     """
-    result, buffer = [], ''
-    reversed_codec = {code: char for char, code in codec.items()}
-    for char in bitstring:
-        buffer += char
-        if buffer in reversed_codec:
-            result.append(reversed_codec[buffer])
-            buffer = ''
-    return ''.join(result)
+    # код префиксный, поэтому bitarray декодирует его за один проход по дереву кодов на уровне C
+    return ''.join(bits.decode(tree))
 
 
-def avg_code_length(codec: dict[str, str], counter: Counter) -> float:
+def avg_code_length(codec: dict[str, str], counter: Counter, n: int | None = None) -> float:
     """
     Подсчитывает среднюю длину для символа по формуле из лекции.
     :param codec: Кодек для кодирования/декодирования текста.
     :param counter: Счётчик символов исходного текста.
+    :param n: Общее количество символов (если уже посчитано), иначе берётся из счётчика.
     :return: Средняя длина символа кодировки.
     """
-    char_counts = sum(counter.values())
+    char_counts = n if n is not None else counter.total()
     # случай, если все символы в тексте идентичные
     if char_counts == 0:
         return 0.0
     return sum((counter[char] / char_counts) * len(code) for char, code in codec.items())
 
 def main() -> None:
-    with open("Workbook2.txt") as file:
+    # читаем файл целиком одним чтением через буфер 1 МиБ (текстовый режим сохраняет нормализацию переводов строк)
+    with open("Workbook2.txt", "r", encoding="utf-8", buffering=1 << 20) as file:
         text = file.read()
     print('1) Исходный текст:', text)
 
-    unigrams = Counter(text)
-    bigrams = Counter(text[i:i + 2] for i in range(len(text) - 1))
+    # для однобайтового текста частоты считаются через bincount, иначе - через Counter
+    unigram_hist, bigram_hist = histograms(text)
+    unigrams, bigrams = unigram_counter(unigram_hist), bigram_counter(bigram_hist)
+    n_unigrams, n_bigrams = unigrams.total(), bigrams.total()
 
-    entropy = calculate_entropy(unigrams)
-    code_length, redundancy = calculate_code_length_and_redundancy(unigrams, entropy)
+    unigrams_entropy = entropy(unigrams, n_unigrams)
+    code_length, redundancy = code_length_and_redundancy(len(unigrams), unigrams_entropy)
     print('2) Энтропия, длина кода и избыточность:')
-    print(' * Энтропия исходного текста:', entropy)
+    print(' * Энтропия исходного текста:', unigrams_entropy)
     print(' * Длина кода:', code_length)
     print(' * Избыточность кода:', redundancy)
 
@@ -131,24 +130,26 @@ def main() -> None:
     for char, code in shannon_fano.items():
         print(f' * {char}: {code}')
 
-    encoded = encode(list(text), shannon_fano)
-    decoded = decode(encoded, shannon_fano)
-    avg_length = avg_code_length(shannon_fano, unigrams)
-    efficiency = entropy / avg_length
+    shannon_fano_code = to_prefix_code(shannon_fano)  # переводим кодек в bitarray один раз
+    encoded = encode(text, shannon_fano_code)
+    decoded = decode(encoded, decodetree(shannon_fano_code))
+    avg_length = avg_code_length(shannon_fano, unigrams, n_unigrams)
+    efficiency = unigrams_entropy / avg_length
     print('4) Свойства закодированного текста и его декодирование:')
-    print(' * Закодированный текст:', encoded)
+    print(' * Закодированный текст:', encoded.to01())
     print(' * Декодированный текст:', decoded)
     print(' * Совпадает ли декодированный текст с исходным?', decoded == text)
     print(' * Средняя длина символа кодировки:', avg_length)
     print(' * Эффективность кодирования:', efficiency, f'({efficiency * 100}%)')
 
-    bigrams_entropy = calculate_entropy(bigrams)
+    bigrams_entropy = entropy(bigrams, n_bigrams)
     bigrams_codec = calculate_shannon_fano(bigrams)
-    bigrams_avg_length = avg_code_length(bigrams_codec, bigrams)
-    bigrams_efficiency = entropy / bigrams_avg_length
+    bigrams_avg_length = avg_code_length(bigrams_codec, bigrams, n_bigrams)
+    bigrams_efficiency = unigrams_entropy / bigrams_avg_length
 
-    bigrams_encoded = encode([text[i:i+2] for i in range(len(text)-1)], bigrams_codec)
-    bigrams_decoded = decode(bigrams_encoded, bigrams_codec)
+    bigrams_code = to_prefix_code(bigrams_codec)
+    bigrams_encoded = encode_bigrams(text, bigrams_code)
+    bigrams_decoded = decode(bigrams_encoded, decodetree(bigrams_code))
 
     print('5) Расчёты для двухбуквенных комбинаций:')
     print(' * Энтропия:', bigrams_entropy)
@@ -157,7 +158,7 @@ def main() -> None:
     print(' * Схема кодирования по Шеннону-Фено:')
     for char, code in bigrams_codec.items():
         print(f'  * {char}: {code}')
-    print(' * Закодированный текст:', bigrams_encoded)
+    print(' * Закодированный текст:', bigrams_encoded.to01())
     print(' * Декодированный текст (наложение биграм):', bigrams_decoded)
 
 
@@ -1,118 +1,144 @@
-from math import log2
+import heapq
+from itertools import count
 from collections import Counter
-from typing import Tuple, Optional
+from typing import Iterable, Tuple
 
+from bitarray import bitarray
 
-def calculate_entropy(counter: Counter) -> float:
-    """
-    Подсчитывает энтропию текста по формуле Шеннона.
-    :param counter: Счётчик символов из текста.
-    :return: Энтропия исходного текста по формуле Шеннона.
-    """
-    n = sum(counter.values())
-    if n == 0:  # единичный случай: все символы текста идентичны
-        return 0.0
-    return sum((c / n) * log2(1 / (c / n)) for c in counter.values())
-
-
-def calculate_code_length_and_redundancy(counter: Counter, entropy: float) -> Tuple[float, float]:
-    """
-    Подсчитывает минимальную длину и её избыточность кода для равномерного побуквенного кодирования текста.
-    :param counter: Счётчик символов исходного текста.
-    :param entropy: Энтропия исходного текста.
-    :return: Минимальная длина кодирования и её избыточность.
-    """
-    symbols_count = len(counter)
-    # единичный случай: все символы текста идентичны
-    if symbols_count <= 1:
-        return 0.0, 0.0
-    code_length = log2(symbols_count)
-    return code_length, 1 - entropy / code_length  # избыточность кода
+from entropy_core import code_length_and_redundancy, entropy, histograms, unigram_counter
 
 
 class Node:
     """Класс, описывающий один узел в алгоритме Хаффмана."""
 
+    _order = count()  # порядковый номер создания узла (для детерминированного сравнения)
+
     def __init__(self, char: str | None, freq: int) -> None:
         self.char = char
         self.freq = freq
+        self.order = next(Node._order)
         self.right: Node | None = None
         self.left: Node | None = None
 
     def __lt__(self, other: 'Node') -> bool:
-        """Сравнение по частоте (для сортировки узлов)."""
-        return self.freq < other.freq
+        """Сравнение по частоте, при равенстве - по порядку создания (для кучи узлов)."""
+        return (self.freq, self.order) < (other.freq, other.order)
 
     @staticmethod
-    def decode_text(encoded_text: str, tree: "Node") -> list[str]:
+    def decode_text(encoded_text: bitarray, codes: dict[str, str]) -> list[str]:
         """
-        Декодирует двоичную строку, проходя по дереву Хаффмана.
-        :param encoded_text: Закодированная строка.
-        :param tree: Корень дерева Хаффмана.
+        Декодирует упакованный набор битов по каноническим кодам Хаффмана.
+        Коды длиной до 8 бит распознаются одним обращением к таблице по очередному окну из 8 бит,
+        более длинные - дочитываются побитово по канонической схеме (первый код и число кодов каждой длины).
+        :param encoded_text: Закодированный текст (упакованный набор битов).
+        :param codes: Канонические коды Хаффмана, полученные из build_huffman_codes.
         :return: Исходный текст, посимвольно.
         """
-        decoded_text = []
-        current_node = tree
-        for bit in encoded_text:
-            if bit == "1":
-                current_node = current_node.left
-            else:
-                current_node = current_node.right
-            # дошли до листа в корне - символ для декодирования найден
-            if current_node and current_node.char:
-                decoded_text.append(current_node.char)
-                current_node = tree  # возвращаемся к корню
+        # символы в каноническом порядке и для каждой длины: первый код, число кодов и смещение в списке
+        entries = sorted(codes.items(), key=lambda x: (len(x[1]), x[1]))
+        symbols = [char for char, _ in entries]
+        max_length = len(entries[-1][1]) if entries else 0
+        first, amount, offset = [0] * (max_length + 1), [0] * (max_length + 1), [0] * (max_length + 1)
+        for i, (_, code) in enumerate(entries):
+            length = len(code)
+            if not amount[length]:
+                first[length], offset[length] = int(code, 2), i
+            amount[length] += 1
+
+        # таблица по 8-битному окну: (символ, длина его кода), если окно начинается с короткого кода
+        table: list[Tuple[str, int] | None] = [None] * 256
+        for char, code in entries:
+            length = len(code)
+            if length > 8:
+                break
+            start = int(code, 2) << (8 - length)
+            table[start:start + (1 << (8 - length))] = [(char, length)] * (1 << (8 - length))
+
+        data = encoded_text.tobytes() + b"\0\0"  # два нулевых байта, чтобы окно не выходило за границу
+        total = len(encoded_text)
+        decoded_text, pos = [], 0
+        while pos < total:
+            index, shift = pos >> 3, pos & 7
+            window = (((data[index] << 8) | data[index + 1]) >> (8 - shift)) & 0xFF
+            entry = table[window]
+            if entry is not None:
+                decoded_text.append(entry[0])
+                pos += entry[1]
+                continue
+            # ни один код длиной до 8 бит не подошёл - продолжаем с 9-го бита побитово
+            code, length = window, 8
+            pos += 8
+            while True:
+                code = (code << 1) | ((data[pos >> 3] >> (7 - (pos & 7))) & 1)
+                length += 1
+                pos += 1
+                if 0 <= code - first[length] < amount[length]:
+                    decoded_text.append(symbols[offset[length] + code - first[length]])
+                    break
         return decoded_text
 
     @staticmethod
-    def build_huffman_codes(chars: list[str], counter: Counter) -> Tuple[dict[str, str], str, Optional["Node"]]:
+    def build_huffman_codes(chars: Iterable[str], counter: Counter) -> Tuple[dict[str, str], bitarray]:
         """
-        Строит дерево Хаффмана по символам и их частотам.
-        :param chars: Список элементов (символов или биграмм) исходного текста.
-        :param counter: Счётчик частот этих элементов.
-        :return: (кодек, закодированная строка, дерево Хаффмана).
+        Строит дерево Хаффмана по символам и их частотам и выводит из него канонические коды.
+        Само дерево не возвращается: канонические коды не совпадают с путями в нём, декодирование идёт по кодеку.
+        :param chars: Последовательность элементов (символов или биграмм) исходного текста.
+        :param counter: Счётчик частот этих элементов (для пустого счётчика получаются пустые кодек и текст).
+        :return: (канонический кодек, закодированный текст в bitarray).
         """
         nodes = [Node(char, freq) for char, freq in counter.items()]
+        if not nodes:  # пустой счётчик: дерева нет, кодировать нечего
+            return {}, bitarray()
+        heapq.heapify(nodes)
         # пока узлов больше одного — объединяем два наименее частых
         while len(nodes) > 1:
-            # находим два узла с минимальными значениями частоты
-            nodes.sort(key=lambda x: x.freq)
-            left = nodes.pop(0)
-            right = nodes.pop(0)
+            # извлекаем из кучи два узла с минимальными значениями частоты
+            left = heapq.heappop(nodes)
+            right = heapq.heappop(nodes)
 
             # создаём новый узел на основе найденных предыдущих
             merged = Node(None, left.freq + right.freq)
             merged.left = left
             merged.right = right
-            nodes.append(merged)
+            heapq.heappush(nodes, merged)
 
-        # рекурсивно обходим дерево и формируем коды
-        huffman_codes = {}
-        def generate_codes(node: Node | None, code: str = "") -> None:
+        # обходим дерево через явный стек и находим длину кода каждого символа (глубину листа)
+        lengths = {}
+        stack = [(nodes[0], 0)]
+        while stack:
+            node, depth = stack.pop()
             if node is None:
-                return
+                continue
             if node.char is not None:
-                huffman_codes[node.char] = code or "0"
-            # генерируем коды для правого поддерева
-            generate_codes(node.right, code + "0")
-            # генерируем коды для левого поддерева
-            generate_codes(node.left, code + "1")
-        generate_codes(nodes[0])
+                lengths[node.char] = depth or 1
+            stack.append((node.left, depth + 1))
+            stack.append((node.right, depth + 1))
+
+        # строим канонические коды: символы упорядочены по (длина, символ), код хранится целым числом
+        # и каждый следующий равен предыдущему + 1, сдвинутому на разницу длин
+        huffman_codes = {}
+        code, prev_length = -1, 0
+        for char, length in sorted(lengths.items(), key=lambda x: (x[1], x[0])):
+            code = (code + 1) << (length - prev_length)
+            prev_length = length
+            huffman_codes[char] = f"{code:0{length}b}"
 
-        # закодированный текст = конкатенация кодов символов
-        return huffman_codes, "".join(huffman_codes[char] for char in chars), nodes[0]
+        # закодированный текст = конкатенация кодов символов, упакованная в bitarray на уровне C
+        encoded = bitarray()
+        encoded.encode({char: bitarray(code) for char, code in huffman_codes.items()}, chars)
+        return huffman_codes, encoded
 
 
-def calculate_avg_length(text: str, codec: dict[str, str], counter: Counter) -> float:
+def calculate_avg_length(codec: dict[str, str], counter: Counter, n: int | None = None) -> float:
     """
     Считает среднюю длину кодового слова по распределению частот.
-    :param text: Исходный текст (для подсчёта общего числа символов).
     :param codec: Кодек, полученный из кодирования алгоритмом Хаффмана.
     :param counter: Счётчик символов.
+    :param n: Общее количество символов (если уже посчитано), иначе берётся из счётчика.
     :return: Средняя длина кода (бит/символ).
     """
     avg_length = 0.0
-    total_length = len(text)
+    total_length = n if n is not None else counter.total()
     for char, code in codec.items():
         probability = counter[char] / total_length
         avg_length += probability * len(code)
@@ -133,50 +159,54 @@ def join_bigrams(bigrams: list[str]) -> str:
 
 
 def main() -> None:
-    with open('Workbook3.txt', 'r', encoding='utf-8') as file:
+    # читаем файл целиком одним чтением через буфер 1 МиБ (текстовый режим сохраняет нормализацию переводов строк)
+    with open('Workbook3.txt', 'r', encoding='utf-8', buffering=1 << 20) as file:
         text = file.read()
 
-    counter = Counter(text)
+    # для однобайтового текста частоты считаются через bincount, иначе - через Counter
+    unigrams, _ = histograms(text, bigrams=False)
+    counter = unigram_counter(unigrams)
+    n = counter.total()
     print('1) Статистическая обработка:')
     for char, freq in sorted(counter.items()):
         print(f' * {char}: {freq}')
 
     print('2) Энтропия, длина при равномерном кодировании и избыточность:')
-    entropy = calculate_entropy(counter)
-    code_length, redundancy = calculate_code_length_and_redundancy(counter, entropy)
+    unigrams_entropy = entropy(unigrams, n)  # гистограмма уже построена, повторный проход по тексту не нужен
+    code_length, redundancy = code_length_and_redundancy(len(counter), unigrams_entropy)
     print(f' * Длина при равномерном кодировании: {code_length:.2f}')
     print(f' * Избыточность длины: {redundancy:.2f}')
 
     print('3) Построение дерева Хаффмана (однобуквенные):')
-    codes, encoded, tree = Node.build_huffman_codes(list(text), counter)
-    decoded = "".join(Node.decode_text(encoded, tree))
-    avg_length = calculate_avg_length(text, codes, counter)
-    efficiency = entropy / avg_length
+    codes, encoded = Node.build_huffman_codes(text, counter)
+    decoded = "".join(Node.decode_text(encoded, codes))
+    avg_length = calculate_avg_length(codes, counter, n)
+    efficiency = unigrams_entropy / avg_length
     print(f' * Коды Хаффмана:')
     for char, code in codes.items():
         print(f'  * {char}: {code}')
-    print(f' * Закодированный текст: {encoded}')
+    print(f' * Закодированный текст: {encoded.to01()}')
     print(f' * Декодированный текст: {decoded} (совпадает? {decoded == text})')
     print(f' * Средняя длина элементарного кода: {avg_length}')
     print(f' * Эффективность кодирования: {efficiency:.2f} ({efficiency * 100:.2f}%)')
 
     print('4) Построение дерева Хаффмана (двухбуквенные):')
-    bigrams = [text[i:i + 2] for i in range(len(text) - 1)]
+    bigrams = [a + b for a, b in zip(text, text[1:])]
     bigrams_counter = Counter(bigrams)
-    bigrams_codes, bigrams_encoded, bigrams_tree = Node.build_huffman_codes(bigrams, bigrams_counter)
-    bigrams_decoded = join_bigrams(Node.decode_text(bigrams_encoded, bigrams_tree))
+    bigrams_n = bigrams_counter.total()
+    bigrams_codes, bigrams_encoded = Node.build_huffman_codes(bigrams, bigrams_counter)
+    bigrams_decoded = join_bigrams(Node.decode_text(bigrams_encoded, bigrams_codes))
 
     # Средняя длина кода на символ (нужно делить на 2, т.к. биграмма = 2 символа)
-    bigrams_avg_length = calculate_avg_length(text, bigrams_codes, bigrams_counter)
-    bigrams_efficiency = calculate_entropy(bigrams_counter) / (
-        sum(freq * len(bigrams_codes[bg]) for bg, freq in bigrams_counter.items()) / sum(bigrams_counter.values())
-    )
+    bigrams_avg_length = calculate_avg_length(bigrams_codes, bigrams_counter, n)
+    bigrams_entropy = entropy(bigrams_counter, bigrams_n)
+    bigrams_efficiency = bigrams_entropy / calculate_avg_length(bigrams_codes, bigrams_counter, bigrams_n)
 
     print(f' * Коды Хаффмана:')
-    print(calculate_entropy(bigrams_counter))
+    print(bigrams_entropy)
     for char, code in bigrams_codes.items():
         print(f'  * {char}: {code}')
-    print(f' * Закодированный текст: {bigrams_encoded}')
+    print(f' * Закодированный текст: {bigrams_encoded.to01()}')
     print(f' * Декодированный текст: {bigrams_decoded} (совпадает? {bigrams_decoded == text})')
     print(f' * Средняя длина элементарного кода: {bigrams_avg_length}')
     print(f' * Эффективность кодирования: {bigrams_efficiency:.2f} ({bigrams_efficiency * 100:.2f}%)')
@@ -0,0 +1,170 @@
+from collections import Counter
+from math import log2
+from typing import Tuple
+
+import numpy as np
+
+# с какой мощности алфавита подсчёт энтропии счётчика выгоднее вести в NumPy, чем в чистом Python
+_NUMPY_MIN_SYMBOLS = 64
+# с какого размера текста (в байтах) импорт numba и загрузка ядра (~0.3 с) окупаются по сравнению с NumPy
+_NUMBA_MIN_BYTES = 1 << 26
+# скомпилированное ядро entropy_u8: загружается при первом вызове на большом тексте
+_entropy_u8_kernel = None
+
+
+def entropy(counter: Counter | np.ndarray, n: int | None = None) -> float:
+    """
+    Подсчитывает энтропию текста по формуле Шеннона.
+    :param counter: Счётчик символов из текста или гистограмма (unigram_histogram/bigram_histogram).
+    :param n: Общее количество символов (если уже посчитано), иначе берётся из счётчика.
+    :return: Энтропия исходного текста по формуле Шеннона.
+    """
+    if isinstance(counter, np.ndarray):
+        n = n if n is not None else int(counter.sum())
+        if n == 0:  # единичный случай: пустой текст
+            return 0.0
+        counts = counter[counter > 0].astype(np.float64)
+    else:
+        n = n if n is not None else counter.total()
+        if n == 0:  # единичный случай: пустой текст
+            return 0.0
+        if len(counter) < _NUMPY_MIN_SYMBOLS:
+            # на малом алфавите накладные расходы NumPy дороже самого подсчёта, поэтому считаем через math.log2
+            return max(0.0, log2(n) - sum(c * log2(c) for c in counter.values() if c) / n)
+        counts = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+        counts = counts[counts > 0]
+    # H = log2(n) - Σ c·log2(c) / n: один логарифм на символ и никаких делений внутри суммы
+    return max(0.0, float(log2(n) - (counts * np.log2(counts)).sum() / n))
+
+
+def code_length_and_redundancy(alphabet_size: int, entropy: float) -> Tuple[float, float]:
+    """
+    Подсчитывает минимальную длину и её избыточность кода для равномерного побуквенного кодирования текста.
+    :param alphabet_size: Мощность алфавита исходного текста.
+    :param entropy: Энтропия исходного текста.
+    :return: Минимальная длина кодирования и её избыточность.
+    """
+    # единичный случай: все символы текста идентичны
+    if alphabet_size <= 1:
+        return 0.0, 0.0
+    code_length = log2(alphabet_size)
+    return code_length, 1 - entropy / code_length  # избыточность кода
+
+
+def ascii_bytes(text: str) -> np.ndarray | None:
+    """
+    Представляет однобайтовый (ASCII) текст в виде массива байтов.
+    Кодирование в bytes копирует текст один раз, np.frombuffer поверх них лишней копии не делает.
+    :param text: Исходный текст.
+    :return: Массив uint8 с байтами текста, или None, если в тексте есть многобайтовые символы.
+    """
+    if not text.isascii():
+        return None
+    return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+
+
+def _entropy_u8_numpy(data: np.ndarray) -> float:
+    """
+    Подсчитывает энтропию однобайтового текста по гистограмме байтов (запасной вариант без numba).
+    :param data: Массив uint8 с байтами текста.
+    :return: Энтропия текста по формуле Шеннона.
+    """
+    return entropy(unigram_histogram(data), data.size)
+
+
+def _entropy_u8_loop(data: np.ndarray) -> float:
+    """
+    Подсчитывает энтропию однобайтового текста за один проход: гистограмма байтов и сумма по ней.
+    Функция предназначена для компиляции numba (см. entropy_u8), напрямую её не вызывают.
+    :param data: Массив uint8 с байтами текста.
+    :return: Энтропия текста по формуле Шеннона.
+    """
+    n = data.size
+    if n == 0:
+        return 0.0
+    counts = np.zeros(256, np.int64)
+    for b in data:
+        counts[b] += 1
+    s = 0.0
+    for c in counts:
+        if c:
+            s += c * np.log2(c)
+    return max(0.0, np.log2(n) - s / n)  # та же формула, что и в entropy()
+
+
+def entropy_u8(data: np.ndarray) -> float:
+    """
+    Подсчитывает энтропию однобайтового текста, когда гистограмма сама по себе не нужна. Тексты меньше
+    _NUMBA_MIN_BYTES (64 МиБ) считаются на NumPy, а для больших при первом вызове импортируется numba
+    и загружается скомпилированное ядро. Решения Workbook1-3 эту функцию не вызывают: им всё равно нужна
+    гистограмма, и энтропия по готовой гистограмме дешевле повторного прохода по тексту, так что ядро -
+    отдельная точка входа для очень больших текстов.
+    :param data: Массив uint8 с байтами текста.
+    :return: Энтропия текста по формуле Шеннона.
+    """
+    global _entropy_u8_kernel
+    if data.size < _NUMBA_MIN_BYTES:
+        return _entropy_u8_numpy(data)
+    if _entropy_u8_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # numba не установлена: используем ядро на NumPy
+            _entropy_u8_kernel = _entropy_u8_numpy
+        else:
+            _entropy_u8_kernel = njit(cache=True)(_entropy_u8_loop)
+    return float(_entropy_u8_kernel(data))
+
+
+def unigram_histogram(data: np.ndarray) -> np.ndarray:
+    """
+    Подсчитывает частоты символов однобайтового текста одним вызовом bincount.
+    :param data: Массив uint8 с байтами текста.
+    :return: Массив из 256 счётчиков, индекс - код байта.
+    """
+    return np.bincount(data, minlength=256)
+
+
+def unigram_counter(hist: np.ndarray | Counter) -> Counter:
+    """
+    Приводит гистограмму символов к счётчику (только встречающиеся символы).
+    :param hist: Гистограмма, полученная из unigram_histogram или histograms (Counter возвращается как есть).
+    :return: Счётчик символов.
+    """
+    if isinstance(hist, Counter):
+        return hist
+    return Counter({chr(b): int(hist[b]) for b in np.flatnonzero(hist)})
+
+
+def bigram_histogram(data: np.ndarray) -> np.ndarray:
+    """
+    Подсчитывает частоты биграмм однобайтового текста одним проходом без хеширования строк.
+    :param data: Массив uint8 с байтами текста.
+    :return: Массив из 65536 счётчиков, индекс биграммы - (код первого байта << 8) | код второго.
+    """
+    pairs = (data[:-1].astype(np.int32) << 8) | data[1:]
+    return np.bincount(pairs, minlength=1 << 16)
+
+
+def bigram_counter(hist: np.ndarray | Counter) -> Counter:
+    """
+    Приводит гистограмму биграмм к счётчику строк-двоек (только встречающиеся биграммы).
+    :param hist: Гистограмма, полученная из bigram_histogram или histograms (Counter возвращается как есть).
+    :return: Счётчик биграмм.
+    """
+    if isinstance(hist, Counter):
+        return hist
+    return Counter({chr(i >> 8) + chr(i & 0xFF): int(hist[i]) for i in np.flatnonzero(hist)})
+
+
+def histograms(text: str, bigrams: bool = True) -> Tuple[np.ndarray | Counter, np.ndarray | Counter | None]:
+    """
+    Строит гистограммы символов и биграмм текста, перекодируя его в байты один раз.
+    :param text: Исходный текст.
+    :param bigrams: Нужно ли считать биграммы.
+    :return: Для ASCII-текста - массивы из unigram_histogram/bigram_histogram, иначе - Counter по символам
+        и биграммам. Вместо гистограммы биграмм возвращается None, если она не запрошена.
+    """
+    data = ascii_bytes(text)
+    if data is None:  # многобайтовые символы в байтовую гистограмму не укладываются
+        return Counter(text), Counter(a + b for a, b in zip(text, text[1:])) if bigrams else None
+    return unigram_histogram(data), bigram_histogram(data) if bigrams else None